@@ -1,13 +1,14 @@
 import csv
 import json
 import uuid
-from contextlib import AbstractContextManager
+from contextlib import AbstractContextManager, contextmanager
 from datetime import datetime
 from pathlib import Path
 from pprint import pformat
-from pydoc import pager
+from tempfile import TemporaryFile
+from time import perf_counter
 from types import SimpleNamespace
-from typing import Dict, Optional, Set
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, TextIO, Tuple
 from urllib.parse import quote as url_quote
 
 import httpx
@@ -17,6 +18,7 @@ from rdflib import BNode, Graph, Literal, Namespace, URIRef  # type: ignore
 from rdflib.namespace import RDF, RDFS, XSD  # type: ignore
 
 from rs_import.logging import log, set_file_log_handler
+from rs_import.review import review_update
 from rs_import.constants import WEB_URL_PATTERN
 
 
@@ -32,6 +34,18 @@ edm = Namespace("http://www.europeana.eu/schemas/edm/")
 m4p0 = Namespace("https://www.museum4punkt0.de/catalogue/ontology/")
 
 
+# an estimate of the memory that is required to submit one triple from an in-memory
+# graph, it's used to decide whether a submission fits into a memory budget
+
+PROJECTED_SUBMISSION_BYTES_PER_TRIPLE = 700
+
+# while a chunk is posted, its lines, the joined statements, the query, its encoded
+# form and the HTTP client's buffers are held at once, hence the encoded statements
+# of a chunk may only take this fraction of a memory budget
+
+SUBMISSION_CHUNK_FRACTION_OF_MEMORY_BUDGET = 1 / 8
+
+
 # validation schemas
 
 dataset_description_schema = {
@@ -109,13 +123,174 @@ entity_description_schema = {
     "URL": {"type": "string", "regex": WEB_URL_PATTERN},
 }
 
-dataset_description_validator = Validator(dataset_description_schema)
-coreset_validator = Validator(coreset_description_schema)
-audio_video_validator = Validator(video_audio_description_schema)
-_3d_validator = Validator(_3d_description_schema)
-entity_validator = Validator(
-    entity_description_schema, allow_unknown={"type": "string"}
+
+def create_validators() -> SimpleNamespace:
+    # validators are stateful, thus concurrent imports must not share instances
+    return SimpleNamespace(
+        dataset_description=Validator(dataset_description_schema),
+        coreset=Validator(coreset_description_schema),
+        audio_video=Validator(video_audio_description_schema),
+        _3d=Validator(_3d_description_schema),
+        entity=Validator(entity_description_schema, allow_unknown={"type": "string"}),
+    )
+
+
+# compact representations of validated rows
+
+
+class CoreRecord(NamedTuple):
+    filename: str
+    rights_statement: Optional[str]
+    license: Optional[str]
+    licensor: Optional[str]
+    related_entity: Optional[str]
+    url: Optional[str]
+
+
+class AudioVideoRecord(NamedTuple):
+    filename: str
+    rights_statement: Optional[str]
+    license: Optional[str]
+    licensor: Optional[str]
+    related_entity: Optional[str]
+    url: Optional[str]
+    duration: Optional[str]
+
+
+class _3DRecord(NamedTuple):
+    filename: str
+    rights_statement: Optional[str]
+    license: Optional[str]
+    licensor: Optional[str]
+    related_entity: Optional[str]
+    url: Optional[str]
+    file_type: Optional[str]
+    geometry_type: Optional[str]
+    geometry_resolution: str
+    textures: Optional[str]
+    vertex_colours: Optional[str]
+    thumbnail: str
+
+
+class EntityRecord(NamedTuple):
+    identifier: str
+    label: str
+    url: Optional[str]
+    arbitrary_fields: Tuple[Tuple[str, str], ...]
+
+
+# the input columns that map to the records' fields
+_core_columns = (
+    "Dateiname",
+    "Rechtehinweis",
+    "Lizenz",
+    "Lizenzgeber",
+    "Bezugsentität",
+    "URL",
 )
+record_columns: Dict[type, Tuple[str, ...]] = {
+    CoreRecord: _core_columns,
+    AudioVideoRecord: _core_columns + ("Dauer",),
+    _3DRecord: _core_columns
+    + (
+        "3D-Dateityp",
+        "Geometrieart",
+        "Geometrieauflösung",
+        "Texturen",
+        "Vertexfarben",
+        "Vorschaubild",
+    ),
+}
+
+
+def spill_graph(graph: Graph, file: TextIO):
+    """ Writes the graph's triples in N-Triples notation to a file, grouped by
+        subject. Each line holds exactly one triple, line breaks in literals are
+        escaped. The descriptions of blank nodes immediately follow the triple
+        that refers to them and groups are separated by an empty line. Thus the
+        file can be split into valid chunks at empty lines.
+    """
+    file.writelines(graph_statements(graph))
+
+
+def graph_statements(graph: Graph) -> Iterator[str]:
+    """ Yields the lines that :func:`spill_graph` writes. """
+    for subject in set(graph.subjects()):
+        if isinstance(subject, BNode) and (None, None, subject) in graph:
+            continue
+        yield from _describe(graph, subject)
+        yield "\n"
+
+
+def _describe(graph: Graph, subject) -> Iterator[str]:
+    for _, predicate, object_ in graph.triples((subject, None, None)):
+        yield f"{subject.n3()} {predicate.n3()} {_n3(object_)} .\n"
+        if isinstance(object_, BNode):
+            yield from _describe(graph, object_)
+
+
+def _n3(term) -> str:
+    # Literal.n3() renders values with line breaks as long strings that span
+    # several lines, but a statement must stay on one line
+    if not isinstance(term, Literal):
+        return term.n3()
+    value = (
+        term.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+    if term.language:
+        return f'"{value}"@{term.language}'
+    if term.datatype:
+        return f'"{value}"^^<{term.datatype}>'
+    return f'"{value}"'
+
+
+def graph_deletion_query(graph_iri: URIRef) -> str:
+    return f"""\
+        DELETE {{?s ?p ?o}}
+        WHERE {{ GRAPH <{graph_iri}> {{?s ?p ?o}} }}
+        """
+
+
+def post_sparql_update(
+    http_client: httpx.Client, config: SimpleNamespace, query: str
+) -> httpx.Response:
+    response = http_client.post(
+        config.sparql_endpoint,
+        auth=(config.sparql_user, config.sparql_pass),
+        data=query.encode(),
+        headers={
+            "Content-Type": "application/sparql-update; charset=UTF-8",
+            "Accept": "text/boolean",
+        },
+    )
+    response.raise_for_status()
+    return response
+
+
+def data_rows(csv_reader: Iterator[List[str]], width: int) -> Iterator[List[str]]:
+    """ Yields the rows of an input file with the data fields, empty lines are
+        skipped and missing trailing fields are filled with empty strings, as
+        :class:`csv.DictReader` would do.
+    """
+    for row in csv_reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [""] * (width - len(row))
+        yield row
+
+
+def column_plan(header: List[str]) -> Tuple[Tuple[int, str], ...]:
+    """ Resolves the column names of an input file's header row once, a trailing
+        * that indicates required fields is removed.
+    """
+    return tuple(
+        (index, name[:-1] if name.endswith("*") else name)
+        for index, name in enumerate(header)
+    )
 
 
 class NamedGraphBackup(AbstractContextManager):
@@ -133,10 +308,17 @@ class NamedGraphBackup(AbstractContextManager):
 
 
 class DataSetImport:
-    def __init__(self, path: Path, config: SimpleNamespace):
+    def __init__(
+        self,
+        path: Path,
+        config: SimpleNamespace,
+        http_client: Optional[httpx.Client] = None,
+    ):
         log.info(f"Setting up import from {path}")
 
+        self.path = path
         self.config = config
+        self.http_client = http_client or httpx.Client()
         self.import_time = datetime.now()
         self.import_time_string = self.import_time.isoformat(timespec="seconds")
 
@@ -146,7 +328,8 @@ class DataSetImport:
         except FileNotFoundError:
             log.error(f"The import folder '{path}' doesn't exist. Aborting.")
             raise SystemExit(1)
-        set_file_log_handler(log_folder / f"{self.import_time_string}.log")
+        self.log_path = log_folder / self.log_filename
+        set_file_log_handler(self.log_path)
 
         self.dataset_description = yaml.load(
             (path / "dataset.yml").read_text(), Loader=yaml.SafeLoader
@@ -168,24 +351,50 @@ class DataSetImport:
         self.creation_iris: Set[URIRef] = set()
         self.creation_uuid_ns: Optional[uuid.UUID] = None
         self.encountered_filenames: Set[str] = set()
+        self.timings: Dict[str, float] = {}
+        self.validators = create_validators()
 
-    def run(self):
-        # generate triples from the various sources
-        self.process_dataset_description()
+    @property
+    def log_filename(self) -> str:
+        return f"{self.import_time_string}.log"
 
-        self.process_images_data()
-        self.process_audio_video_data()
-        self.process_3d_data()
+    def run(self):
+        self.generate()
+        with self.timed("submission"):
+            self.submit()
 
-        graph = self.graph
-        for creation_iri in self.creation_iris:
-            graph.add((creation_iri, RDF.type, crm.E65_Creation))
-            graph.add((creation_iri, m4p0.hasCreationPhase, m4p0.MaterialProduction))
-            graph.add((creation_iri, m4p0.hasCreationMethod, m4p0.Digitisation))
+    def generate(self):
+        # generate triples from the various sources
+        with self.timed("dataset_description"):
+            self.process_dataset_description()
+
+        with self.timed("images"):
+            self.process_images_data()
+        with self.timed("audio_video"):
+            self.process_audio_video_data()
+        with self.timed("3d"):
+            self.process_3d_data()
+
+        with self.timed("creations"):
+            graph = self.graph
+            for creation_iri in self.creation_iris:
+                graph.add((creation_iri, RDF.type, crm.E65_Creation))
+                graph.add(
+                    (creation_iri, m4p0.hasCreationPhase, m4p0.MaterialProduction)
+                )
+                graph.add((creation_iri, m4p0.hasCreationMethod, m4p0.Digitisation))
 
-        self.process_entities_data()
+        with self.timed("entities"):
+            self.process_entities_data()
 
-        self.submit()
+    @contextmanager
+    def timed(self, stage: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = perf_counter() - start
+            log.debug(f"The stage '{stage}' took {self.timings[stage]:.3f} seconds.")
 
     def submit(self):
         # submit the triples to the SPARQL-endpoint
@@ -194,24 +403,38 @@ class DataSetImport:
 
         graph_iri = self.graph.identifier
 
-        turtle_representation: str = self.graph.serialize(
-            format="turtle"
-        ).decode().splitlines()
+        deletion_query = graph_deletion_query(graph_iri)
 
-        deletion_query = f"""\
-        DELETE {{?s ?p ?o}}
-        WHERE {{ GRAPH <{graph_iri}> {{?s ?p ?o}} }}
-        """
+        max_memory = self.config.max_memory
+        if (
+            max_memory is not None
+            and len(self.graph) * PROJECTED_SUBMISSION_BYTES_PER_TRIPLE > max_memory
+        ):
+            log.info(
+                "The projected size of the submission exceeds the memory budget, "
+                "the triples are submitted in chunks from a temporary file."
+            )
+            self.submit_in_chunks(
+                graph_iri,
+                deletion_query,
+                int(max_memory * SUBMISSION_CHUNK_FRACTION_OF_MEMORY_BUDGET),
+            )
+            return
 
-        prefixes = []
-        for i, line in enumerate(turtle_representation):
-            if line.startswith("@prefix "):
-                prefixes.append("PREFIX " + line[8:-2])
-            else:
-                break
+        if self.config.review:
+            review_update(
+                self.config,
+                self.http_client,
+                ((graph_iri, graph_statements(self.graph)),),
+            )
 
-        prefixes_header = "\n".join(prefixes) + "\n"
-        statements = "\n".join(turtle_representation[i + 1 :])  # noqa: E203
+        turtle_representation: str = self.graph.serialize(format="turtle").decode()
+        prefixes, _, statements = turtle_representation.partition("\n\n")
+        del turtle_representation
+
+        prefixes_header = (
+            "\n".join("PREFIX " + line[8:-2] for line in prefixes.splitlines()) + "\n"
+        )
 
         insert_query = f"""\
         {prefixes_header}
@@ -222,13 +445,7 @@ class DataSetImport:
           }}
         }} WHERE {{}}
         """
-
-        if self.config.review:
-            pager(insert_query)
-            review_passed = input("Proceed? [yN]: ").lower()
-            if not review_passed or review_passed[0] != "y":
-                log.critical("User aborted after reviewing the SPARQL query.")
-                raise SystemExit(1)
+        del statements
 
         log.debug("Generated SPARQL Query:")
         log.debug(insert_query)
@@ -242,18 +459,55 @@ class DataSetImport:
         )
         self.post_query(insert_query)
 
-    def post_query(self, query: str):
-        response = httpx.post(
-            self.config.sparql_endpoint,
-            auth=(self.config.sparql_user, self.config.sparql_pass),
-            data=query.encode(),
-            headers={
-                "Content-Type": "application/sparql-update; charset=UTF-8",
-                "Accept": "text/boolean",
-            },
+    def submit_in_chunks(self, graph_iri: URIRef, deletion_query: str, chunk_size: int):
+        with TemporaryFile("w+t", encoding="utf-8") as spill_file:
+            spill_graph(self.graph, spill_file)
+            # the graph isn't needed anymore and is the largest object in memory
+            self.graph = None
+            spill_file.seek(0)
+
+            if self.config.review:
+                review_update(self.config, self.http_client, ((graph_iri, spill_file),))
+                spill_file.seek(0)
+
+            log.info(f"Deleting all existing triples from the graph <{graph_iri}>.")
+            self.post_query(deletion_query)
+
+            log.info(
+                f"Posting generated triples to {self.config.sparql_endpoint} as "
+                f"{self.config.sparql_user} in chunks of up to {chunk_size} bytes."
+            )
+            # a chunk is posted before a subject's group of statements would let it
+            # exceed the size, only a single group that is larger is posted as is
+            chunk: List[str] = []
+            group: List[str] = []
+            size = group_size = 0
+            for line in spill_file:
+                if line != "\n":
+                    group.append(line)
+                    group_size += len(line.encode())
+                    continue
+                if chunk and size + group_size > chunk_size:
+                    self.post_chunk(graph_iri, chunk)
+                    chunk.clear()
+                    size = 0
+                chunk.extend(group)
+                size += group_size
+                group.clear()
+                group_size = 0
+            if chunk:
+                self.post_chunk(graph_iri, chunk)
+
+    def post_chunk(self, graph_iri: URIRef, chunk: List[str]):
+        statements = "".join(chunk)
+        log.debug(f"Posting a chunk of {len(chunk)} triples.")
+        self.post_query(
+            f"INSERT {{ GRAPH <{graph_iri}> {{\n{statements}}} }} WHERE {{}}"
         )
+
+    def post_query(self, query: str):
         try:
-            response.raise_for_status()
+            response = post_sparql_update(self.http_client, self.config, query)
         except Exception:
             log.exception("Something went wrong")
             raise SystemExit(1)
@@ -267,12 +521,13 @@ class DataSetImport:
         input_data = self.dataset_description
 
         log.debug(f"Input data: {input_data}")
-        if not dataset_description_validator(input_data):
+        validator = self.validators.dataset_description
+        if not validator(input_data):
             log.error(
                 "The dataset description document did not validate. These errors were "
                 "reported:"
             )
-            log.error(pformat(dataset_description_validator.errors))
+            log.error(pformat(validator.errors))
             raise SystemExit(1)
         log.debug("Input data validated.")
 
@@ -302,7 +557,9 @@ class DataSetImport:
             return
 
         log.info("# Processing images' metadata.")
-        self.process_metadata_file(source_file, self.add_core_fields, coreset_validator)
+        self.process_metadata_file(
+            source_file, self.add_core_fields, self.validators.coreset, CoreRecord
+        )
         log.info("Done.")
 
     def process_audio_video_data(self):
@@ -313,7 +570,10 @@ class DataSetImport:
 
         log.info("# Processing audios' and videos' metadata")
         self.process_metadata_file(
-            source_file, self.add_audio_video_fields, audio_video_validator
+            source_file,
+            self.add_audio_video_fields,
+            self.validators.audio_video,
+            AudioVideoRecord,
         )
         log.info("Done.")
 
@@ -324,31 +584,34 @@ class DataSetImport:
             return
 
         log.info("# Processing 3D objects' metadata.")
-        self.process_metadata_file(source_file, self.add_3d_fields, _3d_validator)
+        self.process_metadata_file(
+            source_file, self.add_3d_fields, self.validators._3d, _3DRecord
+        )
         log.info("Done.")
 
-    def process_metadata_file(self, source_file, add_method, validator):
+    def process_metadata_file(self, source_file, add_method, validator, record_type):
         with source_file.open("rt", newline="") as f:
-            csv_reader = csv.DictReader(f)
-            for row in csv_reader:
-
-                normalized_row = {}
-                # remove * indicator and drop empty fields
-                for name, value in row.items():
-                    if not value.strip():
-                        continue
-                    if name.endswith("*"):
-                        name = name[:-1]
-                    normalized_row[name] = value
-
-                object_data = validator.validated(normalized_row)
-                filename = object_data.get("Dateiname", "<missing>")
-                if coreset_validator.errors:
+            csv_reader = csv.reader(f)
+            plan = column_plan(next(csv_reader, []))
+            columns = record_columns[record_type]
+            for row in data_rows(csv_reader, len(plan)):
+
+                # drop empty fields
+                document = {name: row[i] for i, name in plan if row[i].strip()}
+                # Cerberus copies every document it validates, the normalized copy
+                # with the coerced filename is used rather than coercing it twice
+                object_data = validator.validated(document)
+                if object_data is None:
+                    filename = document.get("Dateiname", "<missing>")
                     log.error(
                         "A digital object metadata set did not validate. These errors "
                         f"were reported for the file {filename}:"
                     )
-                    log.error(pformat(coreset_validator.errors))
+                    log.error(pformat(validator.errors))
+                    raise SystemExit(1)
+
+                record = record_type._make(map(object_data.get, columns))
+                filename = record.filename
 
                 if filename in self.encountered_filenames:
                     log.error(f"Encountered redundant filename: {filename}")
@@ -356,80 +619,68 @@ class DataSetImport:
                     raise SystemExit(1)
                 self.encountered_filenames.add(filename)
 
-                add_method(
-                    URIRef(self.file_namespace + url_quote(filename)),
-                    filename,
-                    object_data,
-                )
+                add_method(URIRef(self.file_namespace + url_quote(filename)), record)
 
-    def add_core_fields(self, s, filename, object_data):
+    def add_core_fields(self, s, record):
         graph = self.graph
-        if not httpx.head(s).status_code == 200:
+        if not self.http_client.head(s).status_code == 200:
             log.error(f"The resource at {s} is not available.")
             raise SystemExit(1)
-        media_type = self.config.media_types[Path(filename).suffix[1:]]
+        media_type = self.config.media_types[Path(record.filename).suffix[1:]]
         creation_uuid = uuid.uuid5(self.creation_uuid_ns, media_type)
         creation_iri = URIRef(f"{ENTITIES_NAMESPACE}{creation_uuid}")
         self.creation_iris.add(creation_iri)
 
         for p, o in [
             (RDF.type, crmdig["D1.Digital_Object"]),
-            (m4p0.fileName, Literal(filename)),
+            (m4p0.fileName, Literal(record.filename)),
             (edm.dataProvider, self.data_provider),
             (m4p0.hasMediaType, URIRef(media_type)),
             (crm.P94i_was_created_by, creation_iri,),
         ]:
             graph.add((s, p, o))
-        if "Rechtehinweis" in object_data:
-            graph.add((s, dc.rights, Literal(object_data["Rechtehinweis"])))
-        elif "Lizenz" in object_data:
-            graph.add((s, dcterms.license, URIRef(object_data["Lizenz"])))
-            graph.add((s, m4p0.licensor, Literal(object_data["Lizenzgeber"])))
+        if record.rights_statement is not None:
+            graph.add((s, dc.rights, Literal(record.rights_statement)))
+        elif record.license is not None:
+            graph.add((s, dcterms.license, URIRef(record.license)))
+            graph.add((s, m4p0.licensor, Literal(record.licensor)))
         else:
             raise AssertionError
-        if "Bezugsentität" in object_data:
+        if record.related_entity is not None:
             graph.add(
                 (
                     s,
                     m4p0.refersToMuseumObject,
-                    self.create_related_entity_iri(object_data["Bezugsentität"]),
+                    self.create_related_entity_iri(record.related_entity),
                 )
             )
-        if "URL" in object_data:
-            graph.add(
-                (s, edm.shownAt, Literal(object_data["url"], datatype=XSD.anyURI),)
-            )
+        if record.url is not None:
+            graph.add((s, edm.shownAt, Literal(record.url, datatype=XSD.anyURI)))
 
-    def add_audio_video_fields(self, s, filename, object_data):
-        self.add_core_fields(s, filename, object_data)
-        self.graph.add((s, m4p0.length, Literal(object_data["Dauer"])))
+    def add_audio_video_fields(self, s, record):
+        self.add_core_fields(s, record)
+        self.graph.add((s, m4p0.length, Literal(record.duration)))
 
-    def add_3d_fields(self, s, filename, object_data):
-        self.add_core_fields(s, filename, object_data)
+    def add_3d_fields(self, s, record):
+        self.add_core_fields(s, record)
 
         graph = self.graph
 
-        graph.add((s, m4p0.fileNameOfThumbnail, Literal(object_data["Vorschaubild"])))
+        graph.add((s, m4p0.fileNameOfThumbnail, Literal(record.thumbnail)))
 
-        geometrieart = object_data.get("Geometrieart")
-        if geometrieart:
-            graph.add((s, m4p0.geometryType, Literal(geometrieart)))
+        if record.geometry_type:
+            graph.add((s, m4p0.geometryType, Literal(record.geometry_type)))
 
-        dateityp = object_data.get("3D-Dateityp")
-        if dateityp:
-            graph.add((s, m4p0.fileType, Literal(dateityp)))
+        if record.file_type:
+            graph.add((s, m4p0.fileType, Literal(record.file_type)))
 
-        graph.add(
-            (s, m4p0.qualityOfGeometryRes, m4p0[object_data["Geometrieauflösung"]])
-        )
+        graph.add((s, m4p0.qualityOfGeometryRes, m4p0[record.geometry_resolution]))
 
-        vertexfarben = object_data.get("Vertexfarben")
-        if vertexfarben:
-            graph.add((s, m4p0.vertexColour, Literal(vertexfarben)))
+        if record.vertex_colours:
+            graph.add((s, m4p0.vertexColour, Literal(record.vertex_colours)))
 
-        texturen = object_data.get("Texturen")
-        if texturen:
-            graph.add((s, m4p0.textureType, Literal(texturen)))
+        if record.textures:
+            graph.add((s, m4p0.textureType, Literal(record.textures)))
 
     def process_entities_data(self):
         if self.source_files.get("entities") is None:
@@ -437,55 +688,68 @@ class DataSetImport:
             return
         log.info("# Processing entities' metadata.")
 
-        graph = self.graph
-
         with self.source_files["entities"].open("rt", newline="") as f:
-            csv_reader = csv.DictReader(f)
-            for row in csv_reader:
+            csv_reader = csv.reader(f)
+            validator = self.validators.entity
+            plan = column_plan(next(csv_reader, []))
+            arbitrary_columns = tuple(
+                (i, name) for i, name in plan if name not in entity_description_schema
+            )
+            for row in data_rows(csv_reader, len(plan)):
 
-                identifier = row.get("Identifier")
+                entity_data = {name: row[i] for i, name in plan}
+                identifier = entity_data.get("Identifier")
 
-                if not entity_validator(row):
+                if not validator(entity_data):
                     log.error(
                         "An entity description did not validate. These errors "
                         f"were reported for the identifier {identifier}:"
                     )
-                    log.error(pformat(entity_validator.errors))
+                    log.error(pformat(validator.errors))
                     raise SystemExit(1)
 
-                s = self.create_related_entity_iri(identifier)
+                record = EntityRecord(
+                    identifier=identifier,
+                    label=entity_data["Bezeichnung"],
+                    url=entity_data.get("URL") or None,
+                    arbitrary_fields=tuple(
+                        (name, row[i]) for i, name in arbitrary_columns
+                    ),
+                )
+                self.add_entity_fields(record)
 
-                if len(set(graph.triples((None, m4p0.refersToMuseumObject, s)))) < 1:
-                    log.error(
-                        "This identifier is not referenced in the metadata of any "
-                        f"digital object in the created graph: {identifier}"
-                    )
-                    raise SystemExit(1)
+        log.info("Done.")
 
-                label = Literal(row["Bezeichnung"])
-                graph.add((s, RDF.type, m4p0.MuseumObject))
-                graph.add((s, m4p0.museumObjectTitle, label))
-                graph.add((s, RDFS.label, label))
-
-                if "URL" in row:
-                    graph.add((s, edm.isShownAt, URIRef(row["URL"])))
-
-                arbritrary_fields = {
-                    k: v for k, v in row.items() if k not in entity_description_schema
-                }
-                if arbritrary_fields:
-                    blank_node = BNode()
-                    graph.add((blank_node, RDF.type, m4p0.JSONObject))
-                    graph.add(
-                        (
-                            blank_node,
-                            m4p0.jsonData,
-                            Literal(json.dumps(arbritrary_fields)),
-                        )
-                    )
-                    graph.add((s, m4p0.isDescribedBy, blank_node))
+    def add_entity_fields(self, record):
+        graph = self.graph
+        s = self.create_related_entity_iri(record.identifier)
 
-        log.info("Done.")
+        if next(graph.subjects(m4p0.refersToMuseumObject, s), None) is None:
+            log.error(
+                "This identifier is not referenced in the metadata of any "
+                f"digital object in the created graph: {record.identifier}"
+            )
+            raise SystemExit(1)
+
+        label = Literal(record.label)
+        graph.add((s, RDF.type, m4p0.MuseumObject))
+        graph.add((s, m4p0.museumObjectTitle, label))
+        graph.add((s, RDFS.label, label))
+
+        if record.url is not None:
+            graph.add((s, edm.isShownAt, URIRef(record.url)))
+
+        if record.arbitrary_fields:
+            blank_node = BNode()
+            graph.add((blank_node, RDF.type, m4p0.JSONObject))
+            graph.add(
+                (
+                    blank_node,
+                    m4p0.jsonData,
+                    Literal(json.dumps(dict(record.arbitrary_fields))),
+                )
+            )
+            graph.add((s, m4p0.isDescribedBy, blank_node))
 
     def create_related_entity_iri(self, identifier: str) -> URIRef:
         return URIRef(f"{ENTITIES_NAMESPACE}{uuid.uuid5(self.graph_uuid, identifier)}")
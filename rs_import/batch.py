@@ -0,0 +1,225 @@
+""" The batch mode generates the graphs of many import folders and submits them
+    together in updates whose size is bounded. Each of these updates deletes the
+    previous versions of its graphs and inserts the new ones. If an update fails,
+    its graphs are submitted one by one, so that the failure can be attributed
+    to a folder.
+"""
+
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from rdflib import Graph, URIRef  # type: ignore
+
+from rs_import._import import (
+    DataSetImport,
+    graph_deletion_query,
+    graph_statements,
+    post_sparql_update,
+)
+from rs_import.logging import log, redirected_file_log, remove_file_log_handler
+from rs_import.review import ReviewDeclined, review_update
+
+
+class BatchSubmission:
+    def __init__(
+        self, config: SimpleNamespace, http_client: Optional[httpx.Client] = None
+    ):
+        self.config = config
+        self.http_client = http_client or httpx.Client()
+        self.pending: List[Tuple[DataSetImport, URIRef, str]] = []
+        self.pending_size = 0
+        # maps the import folders to either "succeeded" or "failed"
+        self.results: Dict[Path, str] = {}
+
+    def add(self, dataset_import: DataSetImport):
+        graph = dataset_import.graph
+        assert graph is not None
+
+        statements = self.serialize(graph)
+        if statements is None:
+            log.info("The graph is too large for a batch and is submitted on its own.")
+            try:
+                with dataset_import.timed("submission"):
+                    dataset_import.submit()
+            except ReviewDeclined:
+                self.results[dataset_import.path] = "failed"
+                raise
+            except SystemExit:
+                self.results[dataset_import.path] = "failed"
+            else:
+                self.results[dataset_import.path] = "succeeded"
+            return
+
+        # the serialized statements are all that is needed from now on
+        dataset_import.graph = None
+
+        if (
+            self.pending
+            and self.pending_size + len(statements) > self.config.batch_size
+        ):
+            self.flush()
+
+        log.info("The graph is queued for a batched submission.")
+        self.pending.append((dataset_import, graph.identifier, statements))
+        self.pending_size += len(statements)
+
+    def serialize(self, graph: Graph) -> Optional[str]:
+        """ Returns the graph's statements as :func:`rs_import._import.spill_graph`
+            writes them, or ``None`` if they exceed the batch size.
+        """
+        buffer = StringIO()
+        size = 0
+        for line in graph_statements(graph):
+            size += len(line)
+            if size > self.config.batch_size:
+                return None
+            buffer.write(line)
+        return buffer.getvalue()
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending, self.pending_size = self.pending, [], 0
+
+        # a flush may be triggered while the log of an import that isn't part of
+        # the batch is active, the outcome is recorded in the members' logs instead
+        with redirected_file_log(None):
+            log.info(
+                f"# Submitting the graphs of {len(batch)} import folders together."
+            )
+            if self.config.review:
+                try:
+                    review_update(
+                        self.config,
+                        self.http_client,
+                        ((x, StringIO(y)) for _, x, y in batch),
+                    )
+                except ReviewDeclined:
+                    for dataset_import, _, _ in batch:
+                        self.record_result(
+                            dataset_import,
+                            "failed",
+                            f"The review of the batch of {len(batch)} graphs was "
+                            "declined.",
+                        )
+                    raise
+            update = self.generate_update(batch)
+
+            try:
+                post_sparql_update(self.http_client, self.config, update)
+            except Exception as e:
+                log.error(f"The batched submission failed: {e}")
+                log.info("Submitting the batch's graphs one by one.")
+                for member in batch:
+                    self.submit_alone(member, len(batch), e)
+            else:
+                for dataset_import, _, _ in batch:
+                    self.record_result(
+                        dataset_import,
+                        "succeeded",
+                        f"The graph was submitted in a batch of {len(batch)} graphs.",
+                    )
+
+    def submit_alone(
+        self,
+        member: Tuple[DataSetImport, URIRef, str],
+        batch_size: int,
+        batch_error: Exception,
+    ):
+        dataset_import = member[0]
+        try:
+            post_sparql_update(
+                self.http_client, self.config, self.generate_update([member])
+            )
+        except Exception as e:
+            self.record_result(
+                dataset_import,
+                "failed",
+                f"The batch of {batch_size} graphs failed ({batch_error}), as did "
+                f"the submission of this graph on its own: {e}",
+            )
+        else:
+            self.record_result(
+                dataset_import,
+                "succeeded",
+                f"The batch of {batch_size} graphs failed ({batch_error}), but this "
+                "graph was submitted on its own.",
+            )
+
+    def record_result(self, dataset_import: DataSetImport, result: str, message: str):
+        self.results[dataset_import.path] = result
+        # the message is appended to the import's own log
+        with redirected_file_log(dataset_import.log_path):
+            if result == "succeeded":
+                log.info(f"{dataset_import.path}: {message}")
+            else:
+                log.error(f"{dataset_import.path}: {message}")
+
+    @staticmethod
+    def generate_update(batch: Sequence[Tuple[DataSetImport, URIRef, str]]) -> str:
+        deletions = "".join(
+            graph_deletion_query(graph_iri) + ";\n" for _, graph_iri, _ in batch
+        )
+        insertions = "".join(
+            f"GRAPH <{graph_iri}> {{\n{statements}}}\n"
+            for _, graph_iri, statements in batch
+        )
+        return f"{deletions}INSERT DATA {{\n{insertions}}}\n"
+
+
+def run_batched(
+    import_folders: Sequence[Path],
+    config: SimpleNamespace,
+    http_client: Optional[httpx.Client] = None,
+) -> int:
+    """ Imports the given folders with batched submissions and returns an exit
+        code.
+    """
+    batch = BatchSubmission(config, http_client)
+
+    try:
+        for import_folder in import_folders:
+            # records of a folder that can't be set up mustn't go to the previous log
+            remove_file_log_handler()
+            try:
+                dataset_import = DataSetImport(import_folder, config, batch.http_client)
+                dataset_import.generate()
+                batch.add(dataset_import)
+            except ReviewDeclined:
+                # like in the regular mode, a declined review ends the run
+                batch.results.setdefault(import_folder, "failed")
+                log.critical("The remaining imports are skipped.")
+                break
+            except SystemExit:
+                log.error(f"The import from {import_folder} failed.")
+                batch.results[import_folder] = "failed"
+            except Exception:
+                log.exception(
+                    "An unhandled exception occurred in the import from "
+                    f"{import_folder}."
+                )
+                batch.results[import_folder] = "failed"
+    finally:
+        # the already queued graphs are submitted in any case
+        remove_file_log_handler()
+        try:
+            batch.flush()
+        except ReviewDeclined:
+            pass  # the batch's members are recorded as failed
+
+        failed = [str(x) for x, y in batch.results.items() if y == "failed"]
+        log.info(
+            f"# Imported {len(batch.results) - len(failed)} of {len(batch.results)} "
+            "folders."
+        )
+
+    if failed:
+        log.error(f"These imports failed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+__all__ = (BatchSubmission.__name__, run_batched.__name__)
@@ -3,7 +3,7 @@ from argparse import ArgumentParser, Namespace
 from pathlib import Path
 from pprint import pprint
 from types import SimpleNamespace
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
 import yaml
 from cerberus import TypeDefinition, Validator  # type: ignore
@@ -19,7 +19,9 @@ class ImportSpecValidator(Validator):
 
 import_spec_validator = ImportSpecValidator(
     schema={
+        "batch_size": {"type": "integer", "min": 1, "nullable": True},
         "import_folders": {"type": "list", "schema": {"coerce": Path, "type": "path"}},
+        "max_memory": {"type": "integer", "min": 1, "nullable": True},
         "media_types": {
             "type": "dict",
             "keysrules": {"type": "string", "regex": "[a-z0-9]+"},
@@ -37,27 +39,53 @@ import_spec_validator = ImportSpecValidator(
 def generate_config() -> Tuple[List[Path], SimpleNamespace]:
     cli_args = parse_cli_args()
 
-    config_file_path = Path(cli_args.config).expanduser().resolve()
-    with config_file_path.open("rt") as f:
-        config_contents = yaml.load(f, Loader=yaml.SafeLoader)
-
-    import_spec = import_spec_validator.validated(
+    import_spec = validate_import_spec(
         {
-            **config_contents,
+            **read_config_file(cli_args.config),
+            "batch_size": cli_args.batch_size and cli_args.batch_size * 2 ** 20,
             "import_folders": cli_args.import_folder,
+            "max_memory": cli_args.max_memory and cli_args.max_memory * 2 ** 20,
             "review": cli_args.review,
             "verbosity": [logging.INFO, logging.DEBUG][cli_args.verbose],
         }
     )
 
+    import_folders = import_spec.pop("import_folders")
+
+    return import_folders, SimpleNamespace(**import_spec)
+
+
+def generate_server_config() -> Tuple[Namespace, SimpleNamespace]:
+    cli_args = parse_server_cli_args()
+
+    import_spec = validate_import_spec(
+        {
+            **read_config_file(cli_args.config),
+            "batch_size": None,
+            "max_memory": None,
+            "review": False,
+            "verbosity": [logging.INFO, logging.DEBUG][cli_args.verbose],
+        }
+    )
+
+    return cli_args, SimpleNamespace(**import_spec)
+
+
+def read_config_file(path: str) -> Dict[str, Any]:
+    config_file_path = Path(path).expanduser().resolve()
+    with config_file_path.open("rt") as f:
+        return yaml.load(f, Loader=yaml.SafeLoader)
+
+
+def validate_import_spec(document: Dict[str, Any]) -> Dict[str, Any]:
+    import_spec = import_spec_validator.validated(document)
+
     if import_spec is None:
         print("The configuration data did not validate. These errors were reported:")
         pprint(import_spec_validator.errors)
         raise SystemExit(1)
 
-    import_folders = import_spec.pop("import_folders")
-
-    return import_folders, SimpleNamespace(**import_spec_validator.document)
+    return import_spec
 
 
 def parse_cli_args(args: List[str] = sys.argv[1:]) -> Namespace:
@@ -82,10 +110,27 @@ def parse_cli_args(args: List[str] = sys.argv[1:]) -> Namespace:
         action="store_true",
         help="Increases verbosity to DEBUG level.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        metavar="MIB",
+        help="Submits the graphs of several import folders together in updates of "
+        "up to the given size in mebibytes. Failed imports don't abort the "
+        "processing of the remaining folders in this mode.",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=int,
+        metavar="MIB",
+        help="A memory budget in mebibytes. If the projected size of a submission "
+        "exceeds it, the generated triples are written to a temporary file and "
+        "submitted in chunks.",
+    )
     parser.add_argument(
         "--review",
         action="store_true",
-        help="Review and confirm the generated SPARQL update before submitting.",
+        help="Review a summary of the generated SPARQL update and confirm it before "
+        "submitting. All statements can be paged on request.",
     )
     parser.add_argument(
         "import_folder",
@@ -97,4 +142,57 @@ def parse_cli_args(args: List[str] = sys.argv[1:]) -> Namespace:
     return parser.parse_args(args)
 
 
-__all__ = (generate_config.__name__,)
+def parse_server_cli_args(args: List[str] = sys.argv[1:]) -> Namespace:
+    parser = ArgumentParser(
+        description="This service accepts import jobs via a local HTTP API and "
+        "processes them with a bounded pool of workers. "
+        "Please refer to the supplied usage documentation for more details."
+    )
+    parser.add_argument(
+        "--config",
+        default="~/.rs-import.yml",
+        metavar="PATH",
+        help="The path to the configuration file. Default: ~/.rs-import.yml",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="Increases verbosity to DEBUG level.",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="The address to listen on. Default: 127.0.0.1",
+    )
+    parser.add_argument(
+        "--port", type=int, default=8437, help="The port to listen on. Default: 8437"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        metavar="N",
+        help="The number of imports that are processed concurrently. Default: 4",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=64,
+        metavar="N",
+        help="The number of jobs that can be queued, further jobs are rejected "
+        "until there's space again. Default: 64",
+    )
+    parser.add_argument(
+        "--endpoint-concurrency",
+        type=int,
+        default=1,
+        metavar="N",
+        help="The number of submissions that are sent to the SPARQL endpoint "
+        "concurrently. Default: 1",
+    )
+
+    return parser.parse_args(args)
+
+
+__all__ = (generate_config.__name__, generate_server_config.__name__)
@@ -1,12 +1,15 @@
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 # re-exported constants
 DEBUG, INFO = logging.DEBUG, logging.INFO
 
-# re-used global symbol
-file_handler: Optional[logging.FileHandler] = None
+# re-used global symbol, file handlers are kept per thread so that concurrent
+# imports write separate log files
+file_handlers: Dict[int, logging.FileHandler] = {}
 
 console_handler = logging.StreamHandler()
 
@@ -15,17 +18,53 @@ log.setLevel(DEBUG)
 log.addHandler(console_handler)
 
 
-def set_file_log_handler(log_path: Path):
-    global file_handler
+class ThreadFilter(logging.Filter):
+    def __init__(self, thread_id: int):
+        super().__init__()
+        self.thread_id = thread_id
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.thread == self.thread_id
 
-    if file_handler is not None:
-        log.removeHandler(file_handler)
 
-    file_handler = logging.FileHandler(log_path, mode="tw")
+def set_file_log_handler(log_path: Path, mode: str = "tw"):
+    remove_file_log_handler()
+
+    thread_id = threading.get_ident()
+    file_handler = logging.FileHandler(log_path, mode=mode)
     file_handler.setLevel(DEBUG)
+    file_handler.addFilter(ThreadFilter(thread_id))
+    file_handlers[thread_id] = file_handler
     log.addHandler(file_handler)
 
 
+def remove_file_log_handler():
+    file_handler = file_handlers.pop(threading.get_ident(), None)
+    if file_handler is not None:
+        log.removeHandler(file_handler)
+        file_handler.close()
+
+
+@contextmanager
+def redirected_file_log(log_path: Optional[Path]):
+    """ Appends the current thread's records to the given file, or to none, within
+        the context. The previously active file handler is restored afterwards.
+    """
+    thread_id = threading.get_ident()
+    previous_handler = file_handlers.pop(thread_id, None)
+    if previous_handler is not None:
+        log.removeHandler(previous_handler)
+    try:
+        if log_path is not None:
+            set_file_log_handler(log_path, mode="ta")
+        yield
+    finally:
+        remove_file_log_handler()
+        if previous_handler is not None:
+            file_handlers[thread_id] = previous_handler
+            log.addHandler(previous_handler)
+
+
 def set_console_log_level(level: int):
     console_handler.level = level
 
@@ -34,6 +73,8 @@ __all__ = (
     "DEBUG",
     "INFO",
     "log",
+    redirected_file_log.__name__,
+    remove_file_log_handler.__name__,
     set_file_log_handler.__name__,
     set_console_log_level.__name__,
 )
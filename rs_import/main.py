@@ -1,5 +1,6 @@
 from traceback import print_exc
 
+from rs_import.batch import run_batched
 from rs_import.config import generate_config
 from rs_import._import import DataSetImport
 from rs_import.logging import set_console_log_level
@@ -10,11 +11,13 @@ def main():  # pragma: no cover
         import_folders, config = generate_config()
         set_console_log_level(config.verbosity)
 
-        for import_folder in import_folders:
-            dataset_import = DataSetImport(path=import_folder, config=config)
-            dataset_import.run()
-
-        exit_code = 0
+        if config.batch_size is None:
+            for import_folder in import_folders:
+                dataset_import = DataSetImport(path=import_folder, config=config)
+                dataset_import.run()
+            exit_code = 0
+        else:
+            exit_code = run_batched(import_folders, config)
     except SystemExit as e:
         exit_code = e.code
     except Exception:
@@ -0,0 +1,199 @@
+""" The review of generated updates. The statements that are about to be submitted
+    are written to a spooled temporary file while a summary is collected in the
+    same pass. The summary is presented first, paging through all statements is
+    optional.
+"""
+
+import csv
+import os
+import random
+import shlex
+import subprocess
+from collections import Counter
+from pydoc import pager
+from tempfile import SpooledTemporaryFile
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+from rdflib import URIRef  # type: ignore
+from rdflib.namespace import RDF  # type: ignore
+
+from rs_import.logging import log
+
+
+# the number of sample statements and removed subjects that are shown
+SAMPLE_SIZE = 12
+# statements are kept in memory up to this size, larger updates are spooled to disk
+SPOOL_SIZE = 8 * 2 ** 20
+
+RDF_TYPE = RDF.type.n3()
+
+
+def subjects_query(graph_iri: URIRef) -> str:
+    return f"""\
+        SELECT DISTINCT ?s
+        WHERE {{ GRAPH <{graph_iri}> {{?s ?p ?o}} FILTER(isIRI(?s)) }}
+        """
+
+
+class ReviewDeclined(SystemExit):
+    """ Raised when the user declines to proceed after reviewing an update. """
+
+
+class UpdateReview:
+    """ Collects the statements that an update inserts into one or more graphs.
+        The statements are expected in the notation that
+        :func:`rs_import._import.spill_graph` produces.
+    """
+
+    def __init__(self, config: SimpleNamespace, http_client: httpx.Client):
+        self.config = config
+        self.http_client = http_client
+
+        self.file = SpooledTemporaryFile(
+            max_size=SPOOL_SIZE, mode="w+t", encoding="utf-8"
+        )
+        self.triples: Counter = Counter()
+        self.predicates: Counter = Counter()
+        self.types: Counter = Counter()
+        # the subjects that are IRIs, per graph
+        self.subjects: Dict[URIRef, Set[str]] = {}
+        self.samples: List[str] = []
+        self.seen = 0
+        self.random = random.Random()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.file.close()
+
+    def add_graph(self, graph_iri: URIRef, statements: Iterable[str]):
+        """ Adds the statements that are to be inserted into the given graph. """
+        subjects = self.subjects.setdefault(graph_iri, set())
+        samples, seen, triples = self.samples, self.seen, self.triples[graph_iri]
+        predicates, types = self.predicates, self.types
+        write = self.file.write
+
+        write(f"GRAPH <{graph_iri}> {{\n")
+        for line in statements:
+            write(line)
+            if line == "\n":
+                continue
+
+            subject, predicate, object_ = line[:-3].split(" ", 2)
+            seen += 1
+            triples += 1
+            predicates[predicate] += 1
+            if predicate == RDF_TYPE:
+                types[object_] += 1
+            if subject[0] == "<":
+                subjects.add(subject[1:-1])
+
+            # a uniform sample of all statements
+            if len(samples) < SAMPLE_SIZE:
+                samples.append(line)
+            else:
+                index = self.random.randrange(seen)
+                if index < SAMPLE_SIZE:
+                    samples[index] = line
+        write("}\n")
+
+        self.seen, self.triples[graph_iri] = seen, triples
+
+    def stored_subjects(self, graph_iri: URIRef) -> Iterable[str]:
+        """ Yields the subjects that are currently stored in the given graph. """
+        with self.http_client.stream(
+            "POST",
+            self.config.sparql_endpoint,
+            auth=(self.config.sparql_user, self.config.sparql_pass),
+            data={"query": subjects_query(graph_iri)},
+            headers={"Accept": "text/csv"},
+        ) as response:
+            response.raise_for_status()
+            rows = csv.reader(response.iter_lines())
+            next(rows, None)  # the header
+            for row in rows:
+                if row:
+                    yield row[0]
+
+    def summary(self) -> str:
+        lines = [
+            f"The update replaces the contents of {len(self.subjects)} graph(s) with "
+            f"{sum(self.triples.values())} triples.",
+            "",
+        ]
+
+        for graph_iri, subjects in self.subjects.items():
+            lines.append(f"<{graph_iri}>: {self.triples[graph_iri]} triples")
+            existing = removed = 0
+            removed_samples: List[str] = []
+            try:
+                for subject in self.stored_subjects(graph_iri):
+                    if subject in subjects:
+                        existing += 1
+                    else:
+                        removed += 1
+                        if len(removed_samples) < SAMPLE_SIZE:
+                            removed_samples.append(subject)
+            except Exception as e:
+                log.warning(f"The stored subjects of <{graph_iri}> are unknown: {e}")
+                lines.append(f"  {len(subjects)} subjects, unknown how many are new")
+                continue
+            lines.append(
+                f"  {len(subjects) - existing} new subjects, {existing} updated "
+                f"subjects, {removed} removed subjects"
+            )
+            lines.extend(f"  - <{x}>" for x in removed_samples)
+            if removed > len(removed_samples):
+                lines.append(f"  - and {removed - len(removed_samples)} more")
+
+        lines.extend(("", "Triples per predicate:"))
+        lines.extend(f"{y:>10}  {x}" for x, y in self.predicates.most_common())
+        lines.extend(("", "Instances per type:"))
+        lines.extend(f"{y:>10}  {x}" for x, y in self.types.most_common())
+        lines.extend(("", "Sample statements:"))
+        lines.extend(f"  {x.rstrip()}" for x in self.samples)
+        return "\n".join(lines).rstrip() + "\n"
+
+    def page(self):
+        """ Pages all statements with the configured pager. """
+        self.file.flush()
+        self.file.seek(0)
+        command = os.environ.get("PAGER") or "less"
+        try:
+            # the pager reads from the file directly, it isn't loaded into memory
+            self.file.rollover()
+            subprocess.run(shlex.split(command), stdin=self.file, check=False)
+        except OSError:
+            pager(self.file.read())
+
+    def confirm(self):
+        """ Presents the summary and lets the user decide whether to proceed. """
+        print(self.summary())
+        answer: Optional[str] = None
+        while answer is None or answer.startswith("p"):
+            if answer is not None:
+                self.page()
+            answer = input("Proceed? [yN], or [p]age all statements: ").lower()
+        if not answer.startswith("y"):
+            log.critical("User aborted after reviewing the SPARQL update.")
+            raise ReviewDeclined(1)
+
+
+def review_update(
+    config: SimpleNamespace,
+    http_client: httpx.Client,
+    graphs: Iterable[Tuple[URIRef, Iterable[str]]],
+):
+    """ Lets the user review an update, ``graphs`` are pairs of graph IRIs and the
+        statements that are inserted into them.
+    """
+    with UpdateReview(config, http_client) as update_review:
+        for graph_iri, statements in graphs:
+            update_review.add_graph(graph_iri, statements)
+        update_review.confirm()
+
+
+__all__ = (ReviewDeclined.__name__, UpdateReview.__name__, review_update.__name__)
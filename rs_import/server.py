@@ -0,0 +1,346 @@
+""" The import service accepts import jobs via a local HTTP API and processes them
+    with a bounded pool of workers that share one connection pool:
+
+    - ``POST /jobs`` with a JSON object that contains an ``import_folder`` and
+      optionally ``max_memory`` in mebibytes queues a job; if the queue is full,
+      the request is answered with ``503``, if a job for the same folder is
+      already queued or running with ``409``
+    - ``GET /jobs`` lists all known jobs
+    - ``GET /jobs/<id>`` shows a job's status and the timings of its stages
+    - ``GET /jobs/<id>/log`` returns a job's log
+"""
+
+import json
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from copy import copy
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from traceback import format_exc, print_exc
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import httpx
+from cerberus import Validator  # type: ignore
+
+from rs_import._import import DataSetImport
+from rs_import.config import generate_server_config
+from rs_import.logging import log, remove_file_log_handler, set_console_log_level
+
+
+# the number of finished jobs that are kept for inspection
+JOB_HISTORY_SIZE = 1024
+
+job_spec_schema = {
+    "import_folder": {"type": "string", "required": True, "empty": False},
+    "max_memory": {"type": "integer", "min": 1, "nullable": True},
+}
+
+
+class DuplicateJob(Exception):
+    """ Raised when a job for an import folder is queued while another one for
+        that folder is pending.
+    """
+
+    def __init__(self, job: "Job"):
+        super().__init__(job)
+        self.job = job
+
+
+class Job:
+    def __init__(self, import_folder: Path, max_memory: Optional[int] = None):
+        self.id = str(uuid.uuid4())
+        self.import_folder = import_folder
+        self.max_memory = max_memory
+        self.status = "queued"
+        self.queued = datetime.now()
+        self.started: Optional[datetime] = None
+        self.finished: Optional[datetime] = None
+        self.timings: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.log_path: Optional[Path] = None
+
+    @property
+    def pending(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "import_folder": str(self.import_folder),
+            "status": self.status,
+            "queued": self.queued.isoformat(timespec="seconds"),
+            "started": self.started and self.started.isoformat(timespec="seconds"),
+            "finished": self.finished and self.finished.isoformat(timespec="seconds"),
+            "timings": dict(self.timings),
+            "error": self.error,
+        }
+
+
+class JobImport(DataSetImport):
+    """ An import that waits for a free slot of the SPARQL endpoint before it
+        posts a query, the preparation of the queries isn't throttled.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        config: SimpleNamespace,
+        http_client: httpx.Client,
+        endpoint_slots: threading.BoundedSemaphore,
+        log_filename: str,
+    ):
+        # is needed to name the log file during the base class' initialization
+        self._log_filename = log_filename
+        super().__init__(path, config, http_client)
+        self.endpoint_slots = endpoint_slots
+
+    @property
+    def log_filename(self) -> str:
+        return self._log_filename
+
+    def post_query(self, query: str):
+        log.debug("Waiting for a free slot of the SPARQL endpoint.")
+        with self.endpoint_slots:
+            super().post_query(query)
+
+
+class ImportService:
+    def __init__(
+        self,
+        config: SimpleNamespace,
+        workers: int = 4,
+        queue_size: int = 64,
+        endpoint_concurrency: int = 1,
+        http_client: Optional[httpx.Client] = None,
+    ):
+        self.config = config
+        self.http_client = http_client or httpx.Client(
+            pool_limits=httpx.PoolLimits(soft_limit=workers, hard_limit=4 * workers)
+        )
+        self.endpoint_concurrency = endpoint_concurrency
+        self.endpoint_slots: Dict[str, threading.BoundedSemaphore] = {}
+
+        self.jobs: Dict[str, Job] = OrderedDict()
+        self.lock = threading.Lock()
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.workers: List[threading.Thread] = [
+            threading.Thread(target=self.work, name=f"worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+
+    def stop(self):
+        """ Lets the workers finish all queued jobs and waits for them. """
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+
+    def add_job(self, import_folder: Path, max_memory: Optional[int] = None) -> Job:
+        """ Queues a job, raises :class:`queue.Full` if there's no capacity left and
+            :class:`DuplicateJob` if a job for the same folder is pending.
+        """
+        job = Job(import_folder, max_memory)
+        with self.lock:
+            folder = import_folder.resolve()
+            for other_job in self.jobs.values():
+                if other_job.pending and other_job.import_folder.resolve() == folder:
+                    raise DuplicateJob(other_job)
+            self.queue.put_nowait(job)
+            self.jobs[job.id] = job
+            self.prune_jobs()
+        log.info(f"Queued job {job.id} for {import_folder}.")
+        return job
+
+    def prune_jobs(self):
+        finished = [x.id for x in self.jobs.values() if x.finished is not None]
+        for job_id in finished[: max(len(finished) - JOB_HISTORY_SIZE, 0)]:
+            del self.jobs[job_id]
+
+    def slots_for(self, endpoint: str) -> threading.BoundedSemaphore:
+        with self.lock:
+            if endpoint not in self.endpoint_slots:
+                self.endpoint_slots[endpoint] = threading.BoundedSemaphore(
+                    self.endpoint_concurrency
+                )
+            return self.endpoint_slots[endpoint]
+
+    def work(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    break
+                self.process(job)
+            finally:
+                self.queue.task_done()
+
+    def process(self, job: Job):
+        log.info(f"Starting job {job.id}.")
+        job.status, job.started = "running", datetime.now()
+        # the log path is known before the import is set up, which may fail
+        log_filename = f"{job.started.isoformat(timespec='seconds')}_{job.id}.log"
+        job.log_path = job.import_folder / "logs" / log_filename
+
+        config = copy(self.config)
+        config.max_memory = job.max_memory and job.max_memory * 2 ** 20
+
+        try:
+            dataset_import = JobImport(
+                job.import_folder,
+                config,
+                self.http_client,
+                self.slots_for(config.sparql_endpoint),
+                log_filename,
+            )
+            job.timings = dataset_import.timings
+            dataset_import.run()
+        except SystemExit:
+            job.status = "failed"
+            job.error = "The import was aborted, the log contains the details."
+        except Exception:
+            log.exception(f"An unhandled exception occurred in job {job.id}.")
+            job.status, job.error = "failed", format_exc()
+        else:
+            job.status = "succeeded"
+        finally:
+            remove_file_log_handler()
+            job.finished = datetime.now()
+            log.info(f"Finished job {job.id}, it {job.status}.")
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server: "ImportServer"
+
+    def do_GET(self):
+        service = self.server.service
+        path = self.path.strip("/").split("/")
+
+        if path == ["jobs"]:
+            with service.lock:
+                jobs = list(service.jobs.values())
+            self.respond(HTTPStatus.OK, [x.as_dict() for x in jobs])
+            return
+
+        with service.lock:
+            job = service.jobs.get(path[1]) if len(path) in (2, 3) else None
+        if path[0] != "jobs" or job is None:
+            self.respond(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+            return
+
+        if len(path) == 2:
+            self.respond(HTTPStatus.OK, job.as_dict())
+        elif path[2] == "log" and job.log_path is not None and job.log_path.exists():
+            self.respond(HTTPStatus.OK, job.log_path.read_text())
+        else:
+            self.respond(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self.respond(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+            return
+
+        try:
+            job_spec = json.loads(
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            )
+        except ValueError:
+            self.respond(HTTPStatus.BAD_REQUEST, {"error": "Invalid JSON."})
+            return
+        # requests are handled concurrently, hence a validator per request
+        job_spec_validator = Validator(job_spec_schema)
+        if not isinstance(job_spec, dict) or not job_spec_validator(job_spec):
+            self.respond(HTTPStatus.BAD_REQUEST, {"error": job_spec_validator.errors})
+            return
+
+        try:
+            job = self.server.service.add_job(
+                Path(job_spec["import_folder"]), job_spec.get("max_memory")
+            )
+        except queue.Full:
+            self.respond(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "The job queue is full, please retry later."},
+                {"Retry-After": "30"},
+            )
+        except DuplicateJob as e:
+            self.respond(
+                HTTPStatus.CONFLICT,
+                {"error": "A job for this import folder is pending.", "id": e.job.id},
+                {"Location": f"/jobs/{e.job.id}"},
+            )
+        else:
+            self.respond(
+                HTTPStatus.ACCEPTED, job.as_dict(), {"Location": f"/jobs/{job.id}"}
+            )
+
+    def respond(self, status: int, content, headers: Dict[str, str] = {}):
+        if isinstance(content, str):
+            body, content_type = content.encode(), "text/plain; charset=UTF-8"
+        else:
+            body, content_type = json.dumps(content).encode(), "application/json"
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug(f"{self.address_string()} - {format % args}")
+
+
+class ImportServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: ImportService):
+        super().__init__(address, RequestHandler)
+        self.service = service
+
+
+def main():  # pragma: no cover
+    try:
+        cli_args, config = generate_server_config()
+        set_console_log_level(config.verbosity)
+
+        service = ImportService(
+            config,
+            workers=cli_args.workers,
+            queue_size=cli_args.queue_size,
+            endpoint_concurrency=cli_args.endpoint_concurrency,
+        )
+        server = ImportServer((cli_args.host, cli_args.port), service)
+        service.start()
+        log.info(f"Accepting import jobs at http://{cli_args.host}:{cli_args.port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            log.info("Finishing the queued jobs before shutting down.")
+        finally:
+            server.server_close()
+            service.stop()
+
+        exit_code = 0
+    except SystemExit as e:
+        exit_code = e.code
+    except Exception:
+        print("An unhandled exception occurred:\n")
+        print_exc()
+        exit_code = 3
+
+    raise SystemExit(exit_code)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
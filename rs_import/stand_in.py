@@ -0,0 +1,377 @@
+""" A local stand-in for a ResearchSpace instance that allows to exercise the
+    network paths of an import offline, e.g. in tests and benchmarks.
+
+    It is a WSGI application that keeps the submitted triples in memory, answers
+    ``HEAD`` requests for the digital objects' files and accepts the SPARQL
+    updates and queries that this tool generates as well as requests following
+    the SPARQL 1.1 Graph Store HTTP Protocol. An ``httpx.Client`` can be bound to
+    it directly:
+
+        stand_in = StandInTripleStore()
+        client = httpx.Client(app=stand_in)
+
+    Alternatively it can be served on a local port with :meth:`serve` in order to
+    go through actual sockets.
+"""
+
+import csv
+import io
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http import HTTPStatus
+from pathlib import PurePosixPath
+from socketserver import ThreadingMixIn
+from typing import Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from rdflib import ConjunctiveGraph, URIRef  # type: ignore
+
+
+DELETE_GRAPH_PATTERN = re.compile(
+    r"\s*DELETE\s*{\s*\?s\s+\?p\s+\?o\s*}\s*"
+    r"WHERE\s*{\s*GRAPH\s*<(?P<graph>[^>]+)>\s*{\s*\?s\s+\?p\s+\?o\s*}\s*}\s*(;|$)",
+    re.IGNORECASE,
+)
+DROP_GRAPH_PATTERN = re.compile(
+    r"\s*(DROP|CLEAR)\s+(SILENT\s+)?GRAPH\s*<(?P<graph>[^>]+)>\s*(;|$)", re.IGNORECASE
+)
+INSERT_GRAPH_PATTERN = re.compile(
+    r"^(?P<prologue>.*?)INSERT\s*{\s*GRAPH\s*<(?P<graph>[^>]+)>\s*"
+    r"{(?P<statements>.*)}\s*}\s*WHERE\s*{\s*}\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+INSERT_DATA_PATTERN = re.compile(
+    r"^(?P<prologue>.*?)INSERT\s+DATA\s*{(?P<quads>.*)}\s*$", re.IGNORECASE | re.DOTALL,
+)
+SUBJECTS_QUERY_PATTERN = re.compile(
+    r"^\s*SELECT\s+DISTINCT\s+\?s\s+WHERE\s*{\s*GRAPH\s*<(?P<graph>[^>]+)>\s*"
+    r"{\s*\?s\s+\?p\s+\?o\s*}\s*FILTER\s*\(\s*isIRI\s*\(\s*\?s\s*\)\s*\)\s*}\s*$",
+    re.IGNORECASE,
+)
+PREFIX_PATTERN = re.compile(
+    r"PREFIX\s+(?P<prefix>[^\s:]*:)\s*<(?P<iri>[^>]*)>", re.IGNORECASE
+)
+
+RDF_FORMATS = {
+    "application/n-quads": "nquads",
+    "application/n-triples": "nt",
+    "application/rdf+xml": "xml",
+    "text/turtle": "turtle",
+}
+
+
+class UnsupportedRequest(Exception):
+    pass
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInTripleStore:
+    """ The stand-in application. Its behaviour can be adjusted with these
+        arguments:
+
+        :param sparql_path: The path where SPARQL updates are accepted.
+        :param graph_store_path: The path of the Graph Store Protocol endpoint.
+        :param unavailable_files: Filenames for which ``HEAD`` requests are answered
+                                  with ``404``, all others are considered to be
+                                  available.
+        :param latency: Seconds to wait before any response is sent.
+        :param error_rate: The probability with which a request fails with the
+                           ``error_status``.
+        :param error_status: The HTTP status code of injected errors.
+        :param seed: A seed for the random number generator that decides on
+                     injected errors.
+    """
+
+    def __init__(
+        self,
+        sparql_path: str = "/sparql",
+        graph_store_path: str = "/rdf-graph-store",
+        unavailable_files: Iterable[str] = (),
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = HTTPStatus.SERVICE_UNAVAILABLE,
+        seed: Optional[int] = None,
+    ):
+        self.sparql_path = sparql_path
+        self.graph_store_path = graph_store_path
+        self.unavailable_files = set(unavailable_files)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        self.dataset = ConjunctiveGraph()
+        self.lock = threading.RLock()
+        self.random = random.Random(seed)
+        self.pending_errors: List[Tuple[int, Optional[str]]] = []
+        self.reset_counters()
+
+    # counters
+
+    def reset_counters(self):
+        """ Resets all throughput counters. """
+        with self.lock:
+            self.requests: Counter = Counter()
+            self.responses: Counter = Counter()
+            self.active_requests: Counter = Counter()
+            self.max_active_requests: Counter = Counter()
+            self.bytes_received = 0
+            self.triples_received = 0
+            self.started = time.monotonic()
+
+    @property
+    def request_rate(self) -> float:
+        """ The average number of handled requests per second since the counters
+            were (re)set.
+        """
+        elapsed = time.monotonic() - self.started
+        return sum(self.requests.values()) / elapsed if elapsed else 0.0
+
+    # error injection
+
+    def fail_next(
+        self, count: int = 1, status: Optional[int] = None, method: Optional[str] = None
+    ):
+        """ Lets the next ``count`` requests fail deterministically, optionally only
+            those with the given method.
+        """
+        with self.lock:
+            self.pending_errors.extend([(status or self.error_status, method)] * count)
+
+    def _injected_error(self, method: str) -> Optional[int]:
+        with self.lock:
+            for i, (status, error_method) in enumerate(self.pending_errors):
+                if error_method in (None, method):
+                    del self.pending_errors[i]
+                    return status
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.error_status
+        return None
+
+    # store access
+
+    def graph(self, graph_iri: str):
+        """ Returns the named graph with the given IRI from the store. """
+        return self.dataset.get_context(URIRef(graph_iri))
+
+    def __len__(self):
+        """ The number of stored quads. """
+        return sum(len(x) for x in self.dataset.contexts())
+
+    # request handling
+
+    def __call__(self, environ, start_response):
+        method = environ["REQUEST_METHOD"]
+        path = environ.get("PATH_INFO", "/")
+        body = environ["wsgi.input"].read(int(environ.get("CONTENT_LENGTH") or 0))
+
+        with self.lock:
+            self.requests[method] += 1
+            self.bytes_received += len(body)
+            self.active_requests[method] += 1
+            self.max_active_requests[method] = max(
+                self.max_active_requests[method], self.active_requests[method]
+            )
+
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+
+            error_status = self._injected_error(method)
+            if error_status is not None:
+                status, content = error_status, b"Injected error."
+            else:
+                try:
+                    status, content = self.dispatch(method, path, environ, body)
+                except UnsupportedRequest as e:
+                    status, content = HTTPStatus.BAD_REQUEST, str(e).encode()
+                except Exception as e:
+                    status = HTTPStatus.INTERNAL_SERVER_ERROR
+                    content = repr(e).encode()
+        finally:
+            with self.lock:
+                self.active_requests[method] -= 1
+
+        with self.lock:
+            self.responses[int(status)] += 1
+
+        status = HTTPStatus(status)
+        start_response(
+            f"{status.value} {status.phrase}",
+            [
+                ("Content-Type", "text/plain; charset=UTF-8"),
+                ("Content-Length", str(len(content))),
+            ],
+        )
+        return [] if method == "HEAD" else [content]
+
+    def dispatch(self, method, path, environ, body) -> Tuple[int, bytes]:
+        if path == self.sparql_path and method == "POST":
+            content_type = environ.get("CONTENT_TYPE", "")
+            if content_type.startswith("application/x-www-form-urlencoded"):
+                parameters = parse_qs(body.decode())
+                if "query" in parameters:
+                    return self.handle_sparql_query(parameters["query"][0])
+                if "update" in parameters:
+                    return self.handle_sparql_update(parameters["update"][0])
+                raise UnsupportedRequest("Neither a query nor an update was sent.")
+            return self.handle_sparql_update(body.decode())
+        if path == self.graph_store_path:
+            parameters = parse_qs(environ.get("QUERY_STRING", ""))
+            graph_iri = parameters.get("graph", [None])[0]
+            content_type = environ.get("CONTENT_TYPE", "text/turtle")
+            return self.handle_graph_store(method, graph_iri, content_type, body)
+        if method == "HEAD":
+            if PurePosixPath(unquote(path)).name in self.unavailable_files:
+                return HTTPStatus.NOT_FOUND, b""
+            return HTTPStatus.OK, b""
+        return HTTPStatus.NOT_FOUND, b"Not found."
+
+    def handle_sparql_update(self, query: str) -> Tuple[int, bytes]:
+        # a request may consist of deletions of whole graphs that are followed by
+        # one insertion, it is applied as one transaction
+        deletions = []
+        position = 0
+        while True:
+            match = DELETE_GRAPH_PATTERN.match(query, position)
+            if match is None:
+                match = DROP_GRAPH_PATTERN.match(query, position)
+            if match is None:
+                break
+            deletions.append(match.group("graph"))
+            position = match.end()
+        query = query[position:]
+
+        data = ConjunctiveGraph()
+        match = INSERT_GRAPH_PATTERN.match(query)
+        if match:
+            data.get_context(URIRef(match.group("graph"))).parse(
+                data=self.turtle_prefixes(match.group("prologue"))
+                + match.group("statements"),
+                format="turtle",
+            )
+        else:
+            match = INSERT_DATA_PATTERN.match(query)
+            if match:
+                data.parse(
+                    data=self.turtle_prefixes(match.group("prologue"))
+                    + match.group("quads"),
+                    format="trig",
+                )
+            elif query.strip() or not deletions:
+                raise UnsupportedRequest("The stand-in doesn't support this update.")
+
+        with self.lock:
+            for graph_iri in deletions:
+                self.dataset.remove_context(self.graph(graph_iri))
+            self.add_quads(data)
+        return HTTPStatus.OK, b"true"
+
+    def handle_sparql_query(self, query: str) -> Tuple[int, bytes]:
+        # only the query for a graph's subjects is supported, the result is CSV
+        match = SUBJECTS_QUERY_PATTERN.match(query)
+        if match is None:
+            raise UnsupportedRequest("The stand-in doesn't support this query.")
+
+        result = io.StringIO()
+        csv_writer = csv.writer(result)
+        csv_writer.writerow(["s"])
+        with self.lock:
+            graph = self.graph(match.group("graph"))
+            csv_writer.writerows(
+                [x] for x in set(graph.subjects()) if isinstance(x, URIRef)
+            )
+        return HTTPStatus.OK, result.getvalue().encode()
+
+    @staticmethod
+    def turtle_prefixes(prologue: str) -> str:
+        return "".join(
+            f"@prefix {x.group('prefix')} <{x.group('iri')}> .\n"
+            for x in PREFIX_PATTERN.finditer(prologue)
+        )
+
+    def handle_graph_store(
+        self, method: str, graph_iri: Optional[str], content_type: str, body: bytes
+    ) -> Tuple[int, bytes]:
+        rdf_format = RDF_FORMATS.get(content_type.split(";")[0].strip())
+
+        if method == "GET":
+            if graph_iri is None:
+                return HTTPStatus.OK, self.dataset.serialize(format="nquads")
+            return HTTPStatus.OK, self.graph(graph_iri).serialize(format="turtle")
+
+        if method == "DELETE":
+            if graph_iri is None:
+                raise UnsupportedRequest("A graph must be specified.")
+            with self.lock:
+                self.dataset.remove_context(self.graph(graph_iri))
+            return HTTPStatus.NO_CONTENT, b""
+
+        if method in ("POST", "PUT"):
+            if rdf_format is None:
+                raise UnsupportedRequest(f"Unsupported content type: {content_type}")
+            if graph_iri is None and rdf_format != "nquads":
+                raise UnsupportedRequest("A graph must be specified.")
+            with self.lock:
+                if method == "PUT" and graph_iri is not None:
+                    self.dataset.remove_context(self.graph(graph_iri))
+                self.add_data(graph_iri, body.decode(), rdf_format)
+            return HTTPStatus.NO_CONTENT, b""
+
+        return HTTPStatus.METHOD_NOT_ALLOWED, b""
+
+    def add_data(self, graph_iri: Optional[str], data: str, rdf_format: str):
+        parsed_data = ConjunctiveGraph()
+        if graph_iri is None:
+            parsed_data.parse(data=data, format=rdf_format)
+        else:
+            parsed_data.get_context(URIRef(graph_iri)).parse(
+                data=data, format=rdf_format
+            )
+        self.add_quads(parsed_data)
+
+    def add_quads(self, data: ConjunctiveGraph):
+        with self.lock:
+            before = len(self)
+            self.dataset.addN(
+                (s, p, o, self.graph(c.identifier)) for s, p, o, c in data.quads()
+            )
+            self.triples_received += len(self) - before
+
+    # serving
+
+    @contextmanager
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+        """ Serves the stand-in from a background thread and yields its base URL.
+            By default a free port is chosen.
+        """
+        server = make_server(
+            host,
+            port,
+            self,
+            server_class=_ThreadingWSGIServer,
+            handler_class=_QuietRequestHandler,
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://{host}:{server.server_port}"
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+
+__all__ = (StandInTripleStore.__name__,)
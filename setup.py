@@ -7,5 +7,10 @@ setup(
     packages=["rs_import"],
     install_requires=["Cerberus~=1.3", "httpx==0.11.*", "PyYaml~=5.1", "rdflib~=4.2"],
     python_requires=">=3.6",
-    entry_points={"console_scripts": ["rs-import=rs_import.main:main"]},
+    entry_points={
+        "console_scripts": [
+            "rs-import=rs_import.main:main",
+            "rs-import-server=rs_import.server:main",
+        ]
+    },
 )
@@ -3,6 +3,10 @@ from rdflib import Graph
 from rs_import._import import DataSetImport
 
 
+# an entity label that spans several lines, see the multiline_imageset fixture
+MULTILINE_LABEL = "Narrenzunft Fridingen:\n\n5 Larven"
+
+
 class _TestDataSetImport(DataSetImport):
     """ A derived class of an import that stores the resulting graph as `_result`
         property. De-/serialization is applied as an intermediate step to validate
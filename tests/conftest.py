@@ -1,20 +1,110 @@
+import csv
+import shutil
 from pathlib import Path
 from types import SimpleNamespace
 
+import httpx
 from pytest import fixture
 
+from rs_import.stand_in import StandInTripleStore
+from tests import MULTILINE_LABEL
+
 
 @fixture()
 def test_config():
     yield SimpleNamespace(
+        batch_size=None,
         entities_namespace="https://enter.museum4punkt0.de/resource/",
+        max_memory=None,
         media_types={
             "tif": "https://www.iana.org/assignments/media-types/image/tiff",
             "tiff": "https://www.iana.org/assignments/media-types/image/tiff",
         },
+        review=False,
+        sparql_endpoint="http://researchspace.test/sparql",
+        sparql_user="editor",
+        sparql_pass="sEcr3t",
     )
 
 
 @fixture(scope="session")
 def test_data():
     yield Path(__file__).parent / "data"
+
+
+@fixture()
+def stand_in():
+    yield StandInTripleStore()
+
+
+@fixture()
+def http_client(stand_in):
+    with httpx.Client(app=stand_in) as client:
+        yield client
+
+
+@fixture()
+def answers(monkeypatch):
+    """ Yields a list that the answers to the review's prompt are taken from. """
+    answers = []
+    monkeypatch.setattr("builtins.input", lambda prompt: answers.pop(0))
+    yield answers
+
+
+@fixture()
+def generate_imageset(tmp_path):
+    """ Yields a function that writes an import folder with the given number of
+        images' metadata rows and returns its path. Every third image refers to
+        the same entity.
+    """
+
+    def generate(rows: int) -> Path:
+        (tmp_path / "dataset.yml").write_text(
+            'file_namespace: "https://objects.test/generated/"\n'
+            'data_provider: "https://example.org/"\n'
+        )
+        with (tmp_path / "images.csv").open("wt", newline="") as f:
+            csv_writer = csv.writer(f)
+            csv_writer.writerow(
+                [
+                    "Dateiname",
+                    "Lizenz*",
+                    "Lizenzgeber",
+                    "Rechtehinweis*",
+                    "Bezugsentität",
+                    "URL",
+                ]
+            )
+            for i in range(rows):
+                csv_writer.writerow(
+                    [
+                        f"image-{i}.TIF",
+                        "",
+                        "",
+                        "All rights reserved.",
+                        f"object-{i // 3}",
+                        f"https://objects.test/view/{i}",
+                    ]
+                )
+        return tmp_path
+
+    yield generate
+
+
+@fixture()
+def multiline_imageset(test_data, tmp_path):
+    """ Yields a copy of the valid image set where the first entity's label spans
+        several lines.
+    """
+    import_folder = shutil.copytree(
+        test_data / "valid_imageset",
+        tmp_path / "multiline_imageset",
+        ignore=shutil.ignore_patterns("logs"),
+    )
+    entities_path = import_folder / "entities.csv"
+    with entities_path.open("rt", newline="") as f:
+        rows = list(csv.reader(f))
+    rows[1][rows[0].index("Bezeichnung")] = MULTILINE_LABEL
+    with entities_path.open("wt", newline="") as f:
+        csv.writer(f).writerows(rows)
+    yield import_folder
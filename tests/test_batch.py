@@ -0,0 +1,156 @@
+import shutil
+
+import pytest
+
+from rs_import.batch import run_batched
+
+
+TRIPLES_PER_IMAGESET = 7 + 18 * 7 + 12 * 6
+
+
+@pytest.fixture()
+def import_folders(test_data, tmp_path):
+    """ Three copies of the valid image set with distinct file namespaces and an
+        invalid one in between.
+    """
+    folders = []
+    for i in range(3):
+        folder = shutil.copytree(
+            test_data / "valid_imageset",
+            tmp_path / f"imageset_{i}",
+            ignore=shutil.ignore_patterns("logs"),
+        )
+        (folder / "dataset.yml").write_text(
+            f'file_namespace: "https://objects.test/imageset_{i}/"\n'
+            'data_provider: "https://example.org/"\n'
+        )
+        folders.append(folder)
+    folders.insert(
+        1,
+        shutil.copytree(
+            test_data / "invalid_dataset_description_1",
+            tmp_path / "invalid",
+            ignore=shutil.ignore_patterns("logs"),
+        ),
+    )
+    yield folders
+
+
+def test_one_batch(test_config, import_folders, stand_in, http_client):
+    test_config.batch_size = 2 ** 20
+    assert run_batched(import_folders, test_config, http_client) == 1
+
+    assert stand_in.requests["POST"] == 1
+    assert len(list(stand_in.dataset.contexts())) == 3
+    assert len(stand_in) == 3 * TRIPLES_PER_IMAGESET
+
+    for folder in import_folders:
+        log = next((folder / "logs").glob("*.log")).read_text()
+        if folder.name == "invalid":
+            assert "did not validate" in log
+        else:
+            assert "submitted in a batch of 3 graphs" in log
+
+
+def test_resubmission(test_config, import_folders, stand_in, http_client):
+    test_config.batch_size = 2 ** 20
+    for _ in range(2):
+        run_batched(import_folders, test_config, http_client)
+    assert len(stand_in) == 3 * TRIPLES_PER_IMAGESET
+
+
+def test_multiple_batches(test_config, import_folders, stand_in, http_client):
+    # fits two graphs, but not three
+    test_config.batch_size = 150_000
+    assert run_batched(import_folders, test_config, http_client) == 1
+    assert stand_in.requests["POST"] == 2
+    assert len(stand_in) == 3 * TRIPLES_PER_IMAGESET
+
+    # the first batch is submitted when the last folder's graph is added
+    logs = [
+        next((x / "logs").glob("*.log")).read_text()
+        for x in import_folders
+        if x.name != "invalid"
+    ]
+    assert "submitted in a batch of 2 graphs" in logs[0]
+    assert "submitted in a batch of 2 graphs" in logs[1]
+    assert "Submitting the graphs" not in logs[2]
+    assert "queued for a batched submission" in logs[2]
+    assert "submitted in a batch of 1 graphs" in logs[2]
+
+
+def test_too_large_for_a_batch(test_config, import_folders, stand_in, http_client):
+    # the serialized statements of an image set take about 53 kB
+    test_config.batch_size = 50_000
+    assert run_batched(import_folders[2:], test_config, http_client) == 0
+    # a separate deletion and insertion per folder
+    assert stand_in.requests["POST"] == 4
+    assert len(stand_in) == 2 * TRIPLES_PER_IMAGESET
+
+
+def test_batch_size_is_measured(test_config, import_folders, stand_in, http_client):
+    # fits one graph's statements, but not two
+    test_config.batch_size = 100_000
+    assert run_batched(import_folders[2:], test_config, http_client) == 0
+    assert stand_in.requests["POST"] == 2
+    assert len(stand_in) == 2 * TRIPLES_PER_IMAGESET
+
+
+def test_declined_review(
+    test_config, import_folders, stand_in, http_client, answers, caplog
+):
+    # the first batch is reviewed when the last folder's graph is added
+    test_config.batch_size = 150_000
+    test_config.review = True
+    answers.append("n")
+
+    assert run_batched(import_folders, test_config, http_client) == 1
+
+    assert len(stand_in) == 0
+    # no further batch is reviewed
+    assert not answers
+    logs = [
+        next((x / "logs").glob("*.log")).read_text()
+        for x in import_folders
+        if x.name != "invalid"
+    ]
+    assert "review of the batch of 2 graphs was declined" in logs[0]
+    assert "review of the batch of 2 graphs was declined" in logs[1]
+    assert "review of the batch" not in logs[2]
+    assert "# Imported 0 of 4 folders." in caplog.text
+
+
+def test_error_attribution(test_config, import_folders, stand_in, http_client):
+    test_config.batch_size = 2 ** 20
+    # the batched update and the first folder's own submission fail
+    stand_in.fail_next(2, method="POST")
+    assert run_batched(import_folders, test_config, http_client) == 1
+
+    assert stand_in.requests["POST"] == 4
+    assert len(stand_in) == 2 * TRIPLES_PER_IMAGESET
+
+    logs = [
+        next((x / "logs").glob("*.log")).read_text()
+        for x in import_folders
+        if x.name != "invalid"
+    ]
+    assert "as did the submission of this graph on its own" in logs[0]
+    assert "but this graph was submitted on its own" in logs[1]
+    assert "but this graph was submitted on its own" in logs[2]
+
+
+@pytest.mark.parametrize("defect", ("missing_description", "unknown_extension"))
+def test_unexpected_errors(defect, test_config, import_folders, stand_in, http_client):
+    defective_folder = import_folders[2]
+    if defect == "missing_description":
+        (defective_folder / "dataset.yml").unlink()
+    else:
+        images_path = defective_folder / "images.csv"
+        images_path.write_text(images_path.read_text().replace(".TIF", ".xyz", 1))
+    test_config.batch_size = 2 ** 20
+
+    assert run_batched(import_folders, test_config, http_client) == 1
+
+    # the graphs of the folders before and after the defective one are submitted
+    assert stand_in.requests["POST"] == 1
+    assert len(stand_in) == 2 * TRIPLES_PER_IMAGESET
@@ -1,17 +1,19 @@
 import json
+import shutil
 
-from rdflib import Namespace, URIRef
+from rdflib import Literal, Namespace, URIRef
 from rdflib.namespace import RDF
 
 from tests import _TestDataSetImport
 
-
 crmdig = Namespace("http://www.ics.forth.gr/isl/CRMdig/")
 m4p0 = Namespace("https://www.museum4punkt0.de/catalogue/ontology/")
 
 
-def test_imagset_and_entities(test_config, test_data):
-    result = _TestDataSetImport(test_data / "valid_imageset", test_config).run()
+def test_imagset_and_entities(test_config, test_data, http_client):
+    result = _TestDataSetImport(
+        test_data / "valid_imageset", test_config, http_client
+    ).run()
 
     digital_objects = list(result.subjects(RDF.type, crmdig["D1.Digital_Object"]))
     assert len(digital_objects) == len(set(digital_objects)) == 18
@@ -29,3 +31,31 @@ def test_imagset_and_entities(test_config, test_data):
     )
 
     assert len(result) == 7 + 18 * 7 + 12 * 6
+
+
+def test_generated_imageset(test_config, generate_imageset, http_client):
+    result = _TestDataSetImport(generate_imageset(300), test_config, http_client).run()
+
+    assert len(list(result.subjects(RDF.type, crmdig["D1.Digital_Object"]))) == 300
+    assert len(set(result.objects(predicate=m4p0.refersToMuseumObject))) == 100
+    assert len(result) == 4 + 3 + 300 * 8
+
+
+def test_empty_lines_and_short_rows(test_config, test_data, tmp_path, http_client):
+    import_folder = shutil.copytree(
+        test_data / "valid_imageset",
+        tmp_path / "imageset",
+        ignore=shutil.ignore_patterns("logs"),
+    )
+    with (import_folder / "images.csv").open("at", newline="") as f:
+        f.write(
+            '\r\n"C 1.1.2.224-50.TIF",,,"All rights reserved.","C 1.1.2.224-50"'
+            "\r\n\r\n"
+        )
+    with (import_folder / "entities.csv").open("at", newline="") as f:
+        f.write("\r\nBildarchiv,C 1.1.2.224-50,Narrenzunft Rottweil\r\n\r\n")
+
+    result = _TestDataSetImport(import_folder, test_config, http_client).run()
+
+    assert len(list(result.subjects(RDF.type, crmdig["D1.Digital_Object"]))) == 19
+    assert (None, None, Literal("Narrenzunft Rottweil")) in result
@@ -0,0 +1,71 @@
+""" These tests guard against regressions of the memory consumption. The peak
+    allocations are measured with a sample of generated images' metadata and
+    scaled to 10k rows.
+"""
+
+import tracemalloc
+
+import httpx
+import pytest
+
+from rs_import._import import DataSetImport
+
+
+ROWS = 1_000
+
+# thresholds in MiB per 10k rows
+GENERATION_THRESHOLD = 56
+SUBMISSION_THRESHOLD = 32
+BOUNDED_SUBMISSION_THRESHOLD = 10
+
+
+def discarding_endpoint(environ, start_response):
+    environ["wsgi.input"].read(int(environ.get("CONTENT_LENGTH") or 0))
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [b"true"]
+
+
+def peak_allocation(function) -> int:
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        function()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def per_10k_rows(allocation: int) -> float:
+    return allocation / 2 ** 20 * 10_000 / ROWS
+
+
+@pytest.fixture()
+def dataset_import(test_config, generate_imageset):
+    dataset_import = DataSetImport(
+        generate_imageset(ROWS), test_config, httpx.Client(app=discarding_endpoint)
+    )
+    yield dataset_import
+
+
+@pytest.fixture()
+def generated_import(dataset_import):
+    dataset_import.generate()
+    yield dataset_import
+
+
+def test_generation(dataset_import):
+    peak = peak_allocation(dataset_import.generate)
+    assert per_10k_rows(peak) < GENERATION_THRESHOLD
+
+
+def test_submission(generated_import):
+    peak = peak_allocation(generated_import.submit)
+    assert per_10k_rows(peak) < SUBMISSION_THRESHOLD
+
+
+def test_bounded_submission(generated_import):
+    generated_import.config.max_memory = max_memory = 1_000_000
+    peak = peak_allocation(generated_import.submit)
+    assert generated_import.graph is None
+    assert peak < max_memory
+    assert per_10k_rows(peak) < BOUNDED_SUBMISSION_THRESHOLD
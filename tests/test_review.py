@@ -0,0 +1,82 @@
+import pytest
+from rdflib import Literal
+
+from rs_import._import import DataSetImport
+from rs_import.batch import run_batched
+from tests import MULTILINE_LABEL
+
+
+def test_summary(
+    test_config, generate_imageset, stand_in, http_client, answers, capsys
+):
+    DataSetImport(generate_imageset(30), test_config, http_client).run()
+    stored_triples = len(stand_in)
+
+    test_config.review = True
+    answers.append("n")
+    with pytest.raises(SystemExit):
+        DataSetImport(generate_imageset(27), test_config, http_client).run()
+    assert len(stand_in) == stored_triples
+    assert not answers
+
+    summary = capsys.readouterr().out
+    assert f"with {4 + 3 + 27 * 8} triples" in summary
+    assert "0 new subjects, 29 updated subjects, 3 removed subjects" in summary
+    assert "<https://objects.test/generated/image-29.tif>" in summary
+    assert "27  <http://www.ics.forth.gr/isl/CRMdig/D1.Digital_Object>" in summary
+    assert "27  <https://www.museum4punkt0.de/catalogue/ontology/fileName>" in summary
+
+
+def test_paging(
+    test_config, generate_imageset, stand_in, http_client, answers, capfd, monkeypatch
+):
+    monkeypatch.setenv("PAGER", "cat")
+    test_config.review = True
+    answers.extend(("p", "y"))
+
+    DataSetImport(generate_imageset(30), test_config, http_client).run()
+
+    assert len(stand_in) == 4 + 3 + 30 * 8
+    output = capfd.readouterr().out
+    assert "\nGRAPH <https://enter.museum4punkt0.de/resource/" in output
+    assert output.count(" .\n") >= 4 + 3 + 30 * 8
+
+
+def test_chunked_submission(
+    test_config, generate_imageset, stand_in, http_client, answers, capsys
+):
+    test_config.max_memory = 2 ** 16
+    test_config.review = True
+    answers.append("y")
+
+    DataSetImport(generate_imageset(30), test_config, http_client).run()
+
+    assert len(stand_in) == 4 + 3 + 30 * 8
+    assert f"with {4 + 3 + 30 * 8} triples" in capsys.readouterr().out
+
+
+def test_batched_submission(
+    test_config, generate_imageset, stand_in, http_client, answers, capsys
+):
+    test_config.batch_size = 2 ** 20
+    test_config.review = True
+    answers.append("y")
+
+    assert run_batched([generate_imageset(30)], test_config, http_client) == 0
+
+    assert len(stand_in) == 4 + 3 + 30 * 8
+    assert f"1 graph(s) with {4 + 3 + 30 * 8} triples" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("max_memory", (None, 20_000))
+def test_multiline_literal(
+    max_memory, test_config, multiline_imageset, stand_in, http_client, answers, capsys
+):
+    test_config.max_memory = max_memory
+    test_config.review = True
+    answers.append("y")
+
+    DataSetImport(multiline_imageset, test_config, http_client).run()
+
+    assert f"with {7 + 18 * 7 + 12 * 6} triples" in capsys.readouterr().out
+    assert (None, None, Literal(MULTILINE_LABEL)) in stand_in.dataset
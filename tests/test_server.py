@@ -0,0 +1,168 @@
+import queue
+import shutil
+import threading
+import time
+
+import httpx
+import pytest
+
+from rs_import.server import DuplicateJob, ImportServer, ImportService
+from rs_import.stand_in import StandInTripleStore
+
+
+@pytest.fixture()
+def import_folders(test_data, tmp_path):
+    # distinct folders, as only one job per folder can be pending
+    yield [
+        shutil.copytree(test_data / "valid_imageset", tmp_path / f"imageset_{i}")
+        for i in range(3)
+    ]
+
+
+def test_concurrent_jobs(test_config, import_folders):
+    stand_in = StandInTripleStore(latency=0.05)
+    service = ImportService(
+        test_config,
+        workers=3,
+        endpoint_concurrency=1,
+        http_client=httpx.Client(app=stand_in),
+    )
+    service.start()
+    jobs = [service.add_job(x) for x in import_folders]
+    service.queue.join()
+    service.stop()
+
+    for job in jobs:
+        assert job.status == "succeeded", job.error
+        assert job.finished >= job.started >= job.queued
+        assert set(job.timings) == {
+            "dataset_description",
+            "images",
+            "audio_video",
+            "3d",
+            "creations",
+            "entities",
+            "submission",
+        }
+        assert job.log_path.parent == job.import_folder / "logs"
+        # each log only contains the records of its own import
+        assert job.log_path.read_text().count("# Processing images' metadata.") == 1
+
+    assert stand_in.requests["POST"] == 6
+    assert stand_in.max_active_requests["POST"] == 1
+    assert stand_in.max_active_requests["HEAD"] > 1
+
+
+def test_endpoint_slot_is_held_for_posts_only(test_config, test_data, http_client):
+    service = ImportService(test_config, workers=1, http_client=http_client)
+    endpoint_slots = service.slots_for(test_config.sparql_endpoint)
+    endpoint_slots.acquire()
+    service.start()
+    job = service.add_job(test_data / "valid_imageset")
+
+    # the queries are prepared while another submission occupies the endpoint
+    deadline = time.monotonic() + 10
+    while not (
+        job.log_path and "Deleting all existing triples" in job.log_path.read_text()
+    ):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert job.status == "running"
+
+    endpoint_slots.release()
+    service.stop()
+    assert job.status == "succeeded", job.error
+
+
+def test_failing_job(test_config, test_data, http_client):
+    service = ImportService(test_config, workers=1, http_client=http_client)
+    service.start()
+    job = service.add_job(test_data / "invalid_dataset_description_1")
+    service.stop()
+
+    assert job.status == "failed"
+    assert job.error is not None
+    assert "did not validate" in job.log_path.read_text()
+
+
+def test_job_failing_during_setup(test_config, import_folders, http_client):
+    (import_folders[0] / "dataset.yml").unlink()
+    service = ImportService(test_config, workers=1, http_client=http_client)
+    service.start()
+    job = service.add_job(import_folders[0])
+    service.stop()
+
+    assert job.status == "failed"
+    assert job.log_path is not None
+    assert "dataset.yml" in job.log_path.read_text()
+
+
+def test_backpressure(test_config, import_folders, http_client):
+    service = ImportService(test_config, queue_size=1, http_client=http_client)
+    service.add_job(import_folders[0])
+    with pytest.raises(queue.Full):
+        service.add_job(import_folders[1])
+    assert len(service.jobs) == 1
+
+
+def test_duplicate_jobs(test_config, test_data, http_client):
+    service = ImportService(test_config, workers=1, http_client=http_client)
+    job = service.add_job(test_data / "valid_imageset")
+    with pytest.raises(DuplicateJob) as exc_info:
+        service.add_job(test_data / ".." / "data" / "valid_imageset")
+    assert exc_info.value.job is job
+
+    service.start()
+    service.queue.join()
+    # a folder can be imported again once its previous job has finished
+    repeated_job = service.add_job(test_data / "valid_imageset")
+    service.stop()
+
+    assert job.status == repeated_job.status == "succeeded"
+    assert job.log_path != repeated_job.log_path
+    assert job.log_path.read_text().count("# Processing images' metadata.") == 1
+
+
+def test_http_api(test_config, import_folders, http_client):
+    service = ImportService(
+        test_config, workers=1, queue_size=1, http_client=http_client
+    )
+    server = ImportServer(("127.0.0.1", 0), service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    with httpx.Client(base_url=f"http://127.0.0.1:{server.server_port}") as client:
+        response = client.post("/jobs", json={"import_folder": str(import_folders[0])})
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+        assert response.headers["Location"] == f"/jobs/{job['id']}"
+
+        response = client.post("/jobs", json={"import_folder": str(import_folders[0])})
+        assert response.status_code == 409
+        assert response.json()["id"] == job["id"]
+
+        response = client.post("/jobs", json={"import_folder": str(import_folders[1])})
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+        assert client.post("/jobs", json={"max_memory": 1}).status_code == 400
+        assert client.post("/jobs", data=b"{").status_code == 400
+        assert client.get("/jobs/unknown").status_code == 404
+
+        service.start()
+        service.queue.join()
+
+        response = client.get(f"/jobs/{job['id']}")
+        assert response.json()["status"] == "succeeded"
+        assert "submission" in response.json()["timings"]
+
+        assert [x["id"] for x in client.get("/jobs").json()] == [job["id"]]
+
+        response = client.get(f"/jobs/{job['id']}/log")
+        assert response.status_code == 200
+        assert "Submitting graph data" in response.text
+
+    server.shutdown()
+    server.server_close()
+    service.stop()
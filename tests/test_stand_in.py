@@ -0,0 +1,161 @@
+from io import StringIO
+
+import httpx
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import XSD
+
+from rs_import._import import DataSetImport, m4p0, spill_graph
+from rs_import.stand_in import StandInTripleStore
+from tests import MULTILINE_LABEL
+
+
+def test_submission(test_config, test_data, stand_in, http_client):
+    dataset_import = DataSetImport(
+        test_data / "valid_imageset", test_config, http_client
+    )
+    dataset_import.run()
+
+    graph = stand_in.graph(dataset_import.graph.identifier)
+    assert len(graph) == len(stand_in) == 7 + 18 * 7 + 12 * 6
+    assert stand_in.requests == {"HEAD": 18, "POST": 2}
+    assert stand_in.responses == {200: 20}
+    assert stand_in.triples_received == len(graph)
+    assert stand_in.request_rate > 0
+
+
+def test_resubmission_replaces_graph(test_config, test_data, stand_in, http_client):
+    for _ in range(2):
+        DataSetImport(test_data / "valid_imageset", test_config, http_client).run()
+    assert len(stand_in) == 7 + 18 * 7 + 12 * 6
+    assert len(list(stand_in.dataset.subjects(predicate=m4p0.hasMediaType))) == 18
+
+
+def test_unavailable_file(test_config, test_data):
+    stand_in = StandInTripleStore(unavailable_files={"C 1.1.2.17-7.tif"})
+    with httpx.Client(app=stand_in) as client:
+        with pytest.raises(SystemExit):
+            DataSetImport(test_data / "valid_imageset", test_config, client).run()
+    assert stand_in.responses[404] == 1
+    assert stand_in.requests["POST"] == 0
+
+
+def test_injected_errors(test_config, test_data, stand_in, http_client):
+    dataset_import = DataSetImport(
+        test_data / "valid_imageset", test_config, http_client
+    )
+    dataset_import.process_dataset_description()
+
+    stand_in.fail_next()
+    with pytest.raises(SystemExit):
+        dataset_import.submit()
+    assert stand_in.responses[503] == 1
+
+    stand_in.error_rate = 1.0
+    assert http_client.head("https://objects.test/a.tif").status_code == 503
+
+
+def test_graph_store_protocol_via_socket():
+    stand_in = StandInTripleStore(latency=0.01)
+    with stand_in.serve() as base_url:
+        url = base_url + stand_in.graph_store_path
+        graph_iri = "http://example.org/graph"
+
+        response = httpx.put(
+            url,
+            params={"graph": graph_iri},
+            data=b"<http://a> <http://b> <http://c>, <http://d> .",
+            headers={"Content-Type": "text/turtle"},
+        )
+        assert response.status_code == 204
+        assert len(stand_in.graph(graph_iri)) == 2
+
+        response = httpx.post(
+            url,
+            data=b"<http://a> <http://b> <http://e> <http://example.org/other> .\n",
+            headers={"Content-Type": "application/n-quads"},
+        )
+        assert response.status_code == 204
+        assert len(stand_in) == 3
+
+        assert httpx.delete(url, params={"graph": graph_iri}).status_code == 204
+        assert len(stand_in) == 1
+
+        response = httpx.post(
+            base_url + stand_in.sparql_path,
+            data=b"LOAD <http://example.org/data>",
+            headers={"Content-Type": "application/sparql-update"},
+        )
+        assert response.status_code == 400
+
+    assert stand_in.requests == {"PUT": 1, "POST": 2, "DELETE": 1}
+
+
+def test_chunked_submission(test_config, test_data, stand_in, http_client):
+    test_config.max_memory = 20_000
+    dataset_import = DataSetImport(
+        test_data / "valid_imageset", test_config, http_client
+    )
+    dataset_import.generate()
+    expected = Graph()
+    for triple in dataset_import.graph:
+        expected.add(triple)
+    dataset_import.submit()
+
+    assert dataset_import.graph is None
+    assert stand_in.requests["POST"] > 3
+    assert isomorphic(stand_in.dataset, expected)
+
+
+class ChunkRecordingImport(DataSetImport):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.chunk_sizes = []
+
+    def post_chunk(self, graph_iri, chunk):
+        self.chunk_sizes.append(sum(len(x.encode()) for x in chunk))
+        super().post_chunk(graph_iri, chunk)
+
+
+def test_chunk_sizes(test_config, test_data, stand_in, http_client):
+    test_config.max_memory = 20_000
+    dataset_import = ChunkRecordingImport(
+        test_data / "valid_imageset", test_config, http_client
+    )
+    dataset_import.run()
+
+    assert len(dataset_import.chunk_sizes) > 3
+    assert max(dataset_import.chunk_sizes) <= 20_000 / 8
+    assert len(stand_in) == 7 + 18 * 7 + 12 * 6
+
+
+@pytest.mark.parametrize("max_memory", (None, 20_000))
+def test_multiline_literal(
+    max_memory, test_config, multiline_imageset, stand_in, http_client
+):
+    test_config.max_memory = max_memory
+    DataSetImport(multiline_imageset, test_config, http_client).run()
+
+    assert len(stand_in) == 7 + 18 * 7 + 12 * 6
+    assert (None, None, Literal(MULTILINE_LABEL)) in stand_in.dataset
+
+
+def test_spilled_statements():
+    s, p = URIRef("https://objects.test/a.tif"), URIRef("https://example.org/p")
+    graph = Graph()
+    node = BNode()
+    graph.add((s, p, node))
+    graph.add((node, p, Literal('"Larve"\r\n\n\\ Schantle', lang="de")))
+    graph.add((s, p, Literal("2020-02-02", datatype=XSD.date)))
+    graph.add((s, p, Literal("Ümläute")))
+
+    buffer = StringIO()
+    spill_graph(graph, buffer)
+    lines = buffer.getvalue().splitlines()
+
+    assert len(lines) == len(graph) + 1
+    assert lines[-1] == ""
+    parsed_graph = Graph()
+    parsed_graph.parse(data=buffer.getvalue(), format="nt")
+    assert isomorphic(parsed_graph, graph)